@@ -1,7 +1,12 @@
+import math
 import numpy as np
 import bpy
-import bmesh
-from mathutils import Vector
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is not bundled with Blender, fall back to plain NumPy.
+    njit = None
 
 bl_info = {
     "name": "SuperFormula Addon",
@@ -16,6 +21,130 @@ bl_info = {
 }
 
 
+if njit is not None:
+    # No 'nnan'/'ninf' fast-math flags: radii may legitimately be inf/nan,
+    # and NumPy's error model so that zero parameters divide to inf like the
+    # NumPy path instead of raising.
+    _FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+    @njit(fastmath=_FASTMATH, error_model='numpy', cache=True)
+    def _sf_nb(alpha, sp):
+        m, a, b, n1, n2, n3 = sp
+        t = m*0.25*alpha
+        # Scalar math functions, NumPy ufuncs are kept for whole arrays.
+        return (
+            abs(math.cos(t)*(1./a))**n2 +
+            abs(math.sin(t)*(1./b))**n3
+        )**(-1./n1)
+
+    @njit(error_model='numpy', cache=True)
+    def _sf_mirrored_nb(alpha, sp):
+        # Radius on the upper half of alpha mirrored, see supercoords.
+        n = alpha.size
+        h = n // 2
+        r = np.empty(n)
+        for i in range(h, n):
+            r[i] = _sf_nb(alpha[i], sp)
+        for i in range(h):
+            r[i] = r[n-1-i]
+        return r
+
+    @njit(parallel=True, fastmath=_FASTMATH, error_model='numpy', cache=True)
+    def _supercoords_nb(grid, p0, p1, x, y, z):
+        u, v, cu, su, cv, sv = grid
+        r1 = _sf_mirrored_nb(u, p0)
+        r2 = _sf_mirrored_nb(v, p1)
+        r2cv = r2*cv
+        r2sv = r2*sv
+        for i in prange(u.size):
+            r1cu = r1[i]*cu[i]
+            r1su = r1[i]*su[i]
+            for j in range(v.size):
+                x[i, j] = r1cu*r2cv[j]
+                y[i, j] = r1su*r2cv[j]
+                z[i, j] = r2sv[j]
+else:
+    _supercoords_nb = None
+
+
+PI = math.pi
+HALFPI = 0.5*PI
+
+# Per resolution data, this only changes when the resolution does and not
+# while tweaking the shape parameters in the redo panel.
+# Long./lat. angles and their cos/sin, small so a few resolutions are kept
+_UV_CACHE = {}
+_UV_CACHE_SIZE = 8
+# Quad mesh topology and UVs, for the last resolution only
+_TOPOLOGY_CACHE = {}
+# x/y/z output buffers of supercoords, for the last resolution only
+_OUT_CACHE = {}
+
+
+def _uv_grid(shape):
+    '''Returns the (u, v, cos(u), sin(u), cos(v), sin(v)) vectors for a
+    long./lat. resolution, cached across calls.
+    '''
+    key = (int(shape[0]), int(shape[1]))
+    grid = _UV_CACHE.get(key)
+    if grid is None:
+        # Kept float64, see supercoords, and only computed per resolution.
+        u = np.linspace(-PI, PI, num=key[0])  # long., theta
+        v = np.linspace(-HALFPI, HALFPI, num=key[1])  # lat., phi
+        grid = (u, v, np.cos(u), np.sin(u), np.cos(v), np.sin(v))
+        for a in grid:
+            a.flags.writeable = False
+        if len(_UV_CACHE) >= _UV_CACHE_SIZE:
+            _UV_CACHE.clear()
+        _UV_CACHE[key] = grid
+    return grid
+
+
+def _out_buffers(shape):
+    '''Returns UxV float32 (x, y, z) buffers, reused across calls with the
+    same long./lat. resolution.
+    '''
+    key = (int(shape[0]), int(shape[1]))
+    out = _OUT_CACHE.get(key)
+    if out is None:
+        _OUT_CACHE.clear()
+        out = tuple(np.empty(key, dtype=np.float32) for _ in range(3))
+        _OUT_CACHE[key] = out
+    return out
+
+
+# Below this many elements np.power beats the multiplication passes.
+_POWER_MIN_SIZE = 1024
+
+
+def _power(x, e):
+    '''Raises array x to the scalar power e in place. Exponents within
+    float32 rounding of a small integer, common with the presets (e.g.
+    -1/n1 for n1 = 0.2 arrives from the float property as -4.99999993),
+    use exponentiation by squaring instead of the generic pow on large
+    arrays.
+    '''
+    k = round(abs(e)) if np.isfinite(e) else 0
+    if (x.size >= _POWER_MIN_SIZE and 1 <= k <= 8
+            and abs(abs(e) - k) <= 1e-6*k):
+        if k == 2:
+            np.square(x, out=x)
+        elif k > 2:
+            # x already holds base**1, multiply in the remaining k-1.
+            base = x.copy()
+            k -= 1
+            while k:
+                if k & 1:
+                    x *= base
+                k >>= 1
+                if k:
+                    np.square(base, out=base)
+        if e < 0:
+            np.reciprocal(x, out=x)
+        return x
+    return np.power(x, e, out=x)
+
+
 def supercoords(params, shape=(50, 50)):
     '''Returns coordinates of a parametrized 3D supershape.
 
@@ -49,36 +178,119 @@ def supercoords(params, shape=(50, 50)):
 
     Returns
     -------
-    x: UxV array
+    x: UxV float32 array
         x coordinates for each long/lat point
-    y: UxV array
+    y: UxV float32 array
         y coordinates for each long/lat point
-    z: UxV array
+    z: UxV float32 array
         z coordinates for each long/lat point
-    '''
-
-    params = np.atleast_2d(params)
-    if params.shape[0] == 1:
-        params = np.tile(params, (2, 1))
 
-    def sf(alpha, sp): return (
-        np.abs(np.cos(sp[0]*alpha/4.)/sp[1])**sp[4] +
-        np.abs(np.sin(sp[0]*alpha/4.)/sp[2])**sp[5]
-    )**(-1/sp[3])
+    The returned arrays are reused, and overwritten, by the next call with
+    the same resolution. Copy them if they need to outlive that call.
+    '''
 
-    u = np.linspace(-np.pi, np.pi, shape[0])  # long., theta
-    v = np.linspace(-np.pi/2, np.pi/2, shape[1])  # lat., phi
+    # Unpack to two tuples of 6 scalars, kept as NumPy floats so that zero
+    # parameters divide to inf rather than raising ZeroDivisionError.
+    if np.ndim(params) == 1:
+        p0 = p1 = tuple(np.asarray(params, dtype=np.float64))
+    else:
+        p0 = tuple(np.asarray(params[0], dtype=np.float64))
+        p1 = tuple(np.asarray(params[1] if len(params) > 1 else params[0],
+                              dtype=np.float64))
+
+    def sf(alpha, sp):
+        # Evaluated in place on two buffers to avoid a temporary per term,
+        # divisions by the parameters are turned into scalar reciprocals.
+        # The radius is even in alpha for any parameters (|cos| and |sin|
+        # are) and the long./lat. angles are symmetric around 0, so only
+        # the upper half is evaluated and mirrored onto the lower half.
+        n = alpha.size
+        h = n // 2
+        r = np.empty_like(alpha)
+        m, a, b, n1, n2, n3 = sp
+        quarter_m = m*0.25
+        inv_a = 1./a
+        inv_b = 1./b
+        neg_inv_n1 = -1./n1
+        c = np.multiply(alpha[h:], quarter_m, out=r[h:])
+        s = np.sin(c)
+        np.cos(c, out=c)
+        c *= inv_a
+        np.abs(c, out=c)
+        _power(c, n2)
+        s *= inv_b
+        np.abs(s, out=s)
+        _power(s, n3)
+        c += s
+        _power(c, neg_inv_n1)
+        r[:h] = r[n-h:][::-1]
+        return r
+
+    grid = _uv_grid(shape)
+    u, v, cu, su, cv, sv = grid
+    x, y, z = _out_buffers(shape)
+
+    if _supercoords_nb is not None:
+        _supercoords_nb(grid, p0, p1, x, y, z)
+        return x, y, z
+
+    # r1 only depends on u and r2 only on v, so every factor is a 1D
+    # vector and x/y are single outer products. The 1D factors are kept in
+    # float64 as the radius is ill-conditioned near its poles, the UxV
+    # outputs are float32 like Blender's vertex coordinates.
+    r1 = sf(u, p0)
+    r2 = sf(v, p1)
+    r1cu = (r1 * cu).astype(np.float32)
+    r1su = (r1 * su).astype(np.float32)
+    r2cv = (r2 * cv).astype(np.float32)
+
+    np.multiply(r1cu[:, None], r2cv[None, :], out=x)
+    np.multiply(r1su[:, None], r2cv[None, :], out=y)
+    np.copyto(z, (r2 * sv).astype(np.float32)[None, :])
 
-    g = np.meshgrid(v, u)
-    uv = np.stack((g[1], g[0]), -1)
-    r1 = sf(uv[..., 0], params[0])
-    r2 = sf(uv[..., 1], params[1])
+    return x, y, z
 
-    x = r1 * np.cos(u)[:, None] * r2 * np.cos(v)[None, :]
-    y = r1 * np.sin(u)[:, None] * r2 * np.cos(v)[None, :]
-    z = r2 * np.sin(v)[None, :]
 
-    return x, y, z
+def _quad_topology(shape):
+    '''Returns the (loop_start, vertex_index, uv) arrays of the quad mesh
+    for a long./lat. resolution, cached across calls.
+    '''
+    key = (int(shape[0]), int(shape[1]))
+    topology = _TOPOLOGY_CACHE.get(key)
+    if topology is None:
+        U, V = key
+        # Faces, built from quads (D, C, B, A) of the long./lat. grid
+        u = np.arange(U-1, dtype=np.int32)[:, None]
+        v = np.arange(V-1, dtype=np.int32)[None, :]
+        A = u*V + v
+        B = A + 1
+        D = A + V
+        C = D + 1
+        faces = np.stack((D, C, B, A), -1).ravel()  # (U-1)x(V-1)x4
+        loop_start = np.arange(0, faces.size, 4, dtype=np.int32)
+        # UV, per vertex (u, 1-v) gathered per loop
+        uv = np.empty((U, V, 2), dtype=np.float32)
+        uv[..., 0] = np.linspace(0, 1, U, dtype=np.float32)[:, None]
+        uv[..., 1] = 1. - np.linspace(0, 1, V, dtype=np.float32)[None, :]
+        uv = uv.reshape(-1, 2)[faces].ravel()
+        topology = (loop_start, faces, uv)
+        for a in topology:
+            a.flags.writeable = False
+        _TOPOLOGY_CACHE.clear()
+        _TOPOLOGY_CACHE[key] = topology
+    return topology
+
+
+def _set_vertex_coords(mesh, co):
+    '''Writes flat float32 vertex coordinates into mesh. Uses the generic
+    "position" attribute when available (Blender >= 3.5) and falls back to
+    the vertices collection otherwise.
+    '''
+    position = mesh.attributes.get("position")
+    if position is not None:
+        position.data.foreach_set("vector", co)
+    else:
+        mesh.vertices.foreach_set("co", co)
 
 
 def make_bpy_mesh(shape, name='supershape', coll=None, smooth=True, weld=False, subdivide=False):
@@ -107,43 +319,34 @@ def make_bpy_mesh(shape, name='supershape', coll=None, smooth=True, weld=False,
         false.
     '''
     U, V = shape
-    xy = np.stack(np.meshgrid(np.linspace(0, 1, V),
-                              np.linspace(0, 1, U)), -1).astype(np.float32)
-    vertices = np.concatenate(
-        (xy, np.zeros((U, V, 1), dtype=np.float32)), -1).reshape(-1, 3)
-
-    # Vertices
-    bm = bmesh.new()
-    for v in vertices:
-        bm.verts.new(Vector(v))
-    # Required after adding / removing vertices and before accessing them by index.
-    bm.verts.ensure_lookup_table()
-    # Required to actually retrieve the indices later on (or they stay -1).
-    bm.verts.index_update()
-    # Faces
-    for u in range(U-1):
-        for v in range(V-1):
-            A = u*V + v
-            B = u*V + (v+1)
-            C = (u+1)*V + (v+1)
-            D = (u+1)*V + v
-            bm.faces.new((bm.verts[D], bm.verts[C],
-                          bm.verts[B], bm.verts[A]))
-    # UV
-    uv_layer = bm.loops.layers.uv.new()
-    for face in bm.faces:
-        for loop in face.loops:
-            v, u = vertices[loop.vert.index][:2]
-            loop[uv_layer].uv = (u, 1.-v)
-
-    bm.normal_update()
+    loop_start, faces, uv = _quad_topology(shape)
+    nfaces = loop_start.size
+
     mesh = bpy.data.meshes.new(name)
-    bm.to_mesh(mesh)
-    bm.free()
+    # Vertices, added zeroed. The actual coordinates are set through
+    # update_bpy_mesh.
+    mesh.vertices.add(U*V)
+    # Faces
+    mesh.loops.add(faces.size)
+    mesh.polygons.add(nfaces)
+    mesh.polygons.foreach_set("loop_start", loop_start)
+    if bpy.app.version < (4, 0, 0):
+        # Read-only since Blender 4.0, derived from loop_start.
+        mesh.polygons.foreach_set(
+            "loop_total", np.full(nfaces, 4, dtype=np.int32))
+    mesh.loops.foreach_set("vertex_index", faces)
+    # UV, stored as a generic 2D vector attribute since Blender 3.5
+    uv_layer = mesh.uv_layers.new()
+    uv_attr = mesh.attributes.get(uv_layer.name)
+    if uv_attr is not None and uv_attr.data_type == 'FLOAT2':
+        uv_attr.data.foreach_set("vector", uv)
+    else:
+        uv_layer.data.foreach_set("uv", uv)
+
+    mesh.update(calc_edges=True)
 
     if smooth:
-        for f in mesh.polygons:
-            f.use_smooth = True
+        mesh.polygons.foreach_set("use_smooth", np.ones(nfaces, dtype=bool))
 
     obj = bpy.data.objects.new(name, mesh)
     del mesh
@@ -178,24 +381,19 @@ def update_bpy_mesh(x, y, z, obj):
     obj: bpy.types.Object
         Object to update. Note that the long./lat. resolution must match.
     '''
-    x = x.reshape(-1, 1)
-    y = y.reshape(-1, 1)
-    z = z.reshape(-1, 1)
-    flat = np.concatenate((x, y, z), -1)
-    obj.data.vertices.foreach_set("co", flat.reshape(-1))
-
-    # Update normals
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    # Instead of closing seams at data level through
-    # bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=1e-3)
-    # use a weld mesh modifier.
-    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
-    bm.to_mesh(obj.data)
-    bm.clear()
+    # Pack as contiguous float32, matching Blender's vertex coordinates,
+    # so foreach_set can copy the buffer directly.
+    flat = np.empty((x.size, 3), dtype=np.float32)
+    flat[:, 0] = x.ravel()
+    flat[:, 1] = y.ravel()
+    flat[:, 2] = z.ravel()
+    _set_vertex_coords(obj.data, flat.ravel())
+
+    # Topology is unchanged, normals are recomputed by Blender on update.
+    # The (D, C, B, A) quad winding of make_bpy_mesh already faces outwards,
+    # so no normal recalculation is needed. Instead of closing seams at data
+    # level through bmesh.ops.remove_doubles use a weld mesh modifier.
     obj.data.update()
-    bm.free()
-    del bm
 
 
 class ObjectSuperFormula3D(bpy.types.Operator):